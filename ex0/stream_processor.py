@@ -1,11 +1,128 @@
-from typing import Any, List, Dict, Union, Optional
+from typing import (Any, List, Dict, Union, Optional, Tuple, Callable,
+                    Iterator, Protocol)
 from abc import ABC, abstractmethod
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+
+
+class Tracer(Protocol):
+    def on_start(self, kind: str, name: str) -> None:
+        ...
+
+    def on_end(self, kind: str, name: str, elapsed: float) -> None:
+        ...
+
+    def on_error(self, kind: str, name: str, elapsed: float,
+                 error: BaseException) -> None:
+        ...
+
+
+class TracerSlot:
+    def __init__(self, tracer: Tracer, sample_every: int) -> None:
+        self.tracer: Tracer = tracer
+        self.sample_every: int = sample_every
+        self.counter: Iterator[int] = itertools.count()
+
+    def sampled(self) -> bool:
+        return next(self.counter) % self.sample_every == 0
+
+
+tracers: List[TracerSlot] = []
+trace_state: threading.local = threading.local()
+
+
+def register_tracer(tracer: Tracer, sample_every: int = 1) -> None:
+    global tracers
+    if sample_every <= 0:
+        raise ValueError("sample_every must be positive")
+    tracers = tracers + [TracerSlot(tracer, sample_every)]
+
+
+def unregister_tracer(tracer: Tracer) -> None:
+    global tracers
+    tracers = [slot for slot in tracers if slot.tracer is not tracer]
+
+
+def trace_call(kind: str, name: str, func: Callable[..., Any],
+               *args: Any, **kwargs: Any) -> Any:
+    active: Optional[List[Tracer]] = getattr(trace_state, "active", None)
+    if active is not None:
+        return emit_call(active, kind, name, func, args, kwargs)
+    active = [slot.tracer for slot in tracers if slot.sampled()]
+    trace_state.active = active
+    try:
+        return emit_call(active, kind, name, func, args, kwargs)
+    finally:
+        trace_state.active = None
+
+
+def emit_call(active: List[Tracer], kind: str, name: str,
+              func: Callable[..., Any], args: Tuple[Any, ...],
+              kwargs: Dict[str, Any]) -> Any:
+    if not active:
+        return func(*args, **kwargs)
+    started: List[Tracer] = []
+    for tracer in active:
+        try:
+            tracer.on_start(kind, name)
+            started += [tracer]
+        except Exception:
+            pass
+    start: float = time.perf_counter()
+    try:
+        result: Any = func(*args, **kwargs)
+    except BaseException as e:
+        elapsed: float = time.perf_counter() - start
+        for tracer in reversed(started):
+            try:
+                tracer.on_error(kind, name, elapsed, e)
+            except Exception:
+                pass
+        raise
+    elapsed = time.perf_counter() - start
+    for tracer in reversed(started):
+        try:
+            tracer.on_end(kind, name, elapsed)
+        except Exception:
+            pass
+    return result
+
+
+def traced(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not tracers:
+                return method(self, *args, **kwargs)
+            name: str = f"{type(self).__name__}.{method.__name__}"
+            return trace_call(kind, name, method, self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def load_env_tracer() -> Any:
+    if not os.environ.get("NEXUS_TRACE"):
+        return None
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import nexus_trace
+    return nexus_trace.install_env_tracer(register_tracer)
 
 
 class DataProcessor(ABC):
     def __init__(self) -> None:
         super().__init__()
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "process" in cls.__dict__:
+            cls.process = traced("processor")(cls.__dict__["process"])
+
     @abstractmethod
     def process(self, data: Any) -> str:
         pass
@@ -176,26 +293,31 @@ def polymorphic_processing(i: int,
 
 
 def main() -> None:
-    print("=== CODE NEXUS - DATA PROCESSOR FOUNDATION ===")
-    print()
-    data_bases: List[tuple[str, DataProcessor, Any]] = [
-        ("Numeric", NumericProcessor(), [1, 2, 3, 4, 5]),
-        ("Text", TextProcessor(), "Hello Nexus World"),
-        ("Log", LogProcessor(), "ERROR: Connection timeout"),
-    ]
-    for name, processor, data_base in data_bases:
-        processor_foundation(name, processor, data_base)
-    print("=== Polymorphic Processing Demo ===")
-    print("Processing multiple data types through same interface...")
-    data_bases: List[tuple[int, DataProcessor, Any]] = [
-        (1, NumericProcessor(), [1, 2, 3]),
-        (2, TextProcessor(), "Nexus World!"),
-        (3, LogProcessor(), "INFO: System ready"),
-    ]
-    for i, processor, data_base in data_bases:
-        polymorphic_processing(i, processor, data_base)
-    print()
-    print("Foundation systems online. Nexus ready for advanced streams.")
+    collector: Any = load_env_tracer()
+    try:
+        print("=== CODE NEXUS - DATA PROCESSOR FOUNDATION ===")
+        print()
+        data_bases: List[tuple[str, DataProcessor, Any]] = [
+            ("Numeric", NumericProcessor(), [1, 2, 3, 4, 5]),
+            ("Text", TextProcessor(), "Hello Nexus World"),
+            ("Log", LogProcessor(), "ERROR: Connection timeout"),
+        ]
+        for name, processor, data_base in data_bases:
+            processor_foundation(name, processor, data_base)
+        print("=== Polymorphic Processing Demo ===")
+        print("Processing multiple data types through same interface...")
+        data_bases: List[tuple[int, DataProcessor, Any]] = [
+            (1, NumericProcessor(), [1, 2, 3]),
+            (2, TextProcessor(), "Nexus World!"),
+            (3, LogProcessor(), "INFO: System ready"),
+        ]
+        for i, processor, data_base in data_bases:
+            polymorphic_processing(i, processor, data_base)
+        print()
+        print("Foundation systems online. Nexus ready for advanced streams.")
+    finally:
+        if collector is not None:
+            collector.flush()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,118 @@
-from typing import Any, List, Dict, Union, Optional
+from typing import (Any, List, Dict, Union, Optional, Tuple, Callable,
+                    Iterator, Protocol)
 from abc import ABC, abstractmethod
+from array import array
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+
+
+class Tracer(Protocol):
+    def on_start(self, kind: str, name: str) -> None:
+        ...
+
+    def on_end(self, kind: str, name: str, elapsed: float) -> None:
+        ...
+
+    def on_error(self, kind: str, name: str, elapsed: float,
+                 error: BaseException) -> None:
+        ...
+
+
+class TracerSlot:
+    def __init__(self, tracer: Tracer, sample_every: int) -> None:
+        self.tracer: Tracer = tracer
+        self.sample_every: int = sample_every
+        self.counter: Iterator[int] = itertools.count()
+
+    def sampled(self) -> bool:
+        return next(self.counter) % self.sample_every == 0
+
+
+tracers: List[TracerSlot] = []
+trace_state: threading.local = threading.local()
+
+
+def register_tracer(tracer: Tracer, sample_every: int = 1) -> None:
+    global tracers
+    if sample_every <= 0:
+        raise ValueError("sample_every must be positive")
+    tracers = tracers + [TracerSlot(tracer, sample_every)]
+
+
+def unregister_tracer(tracer: Tracer) -> None:
+    global tracers
+    tracers = [slot for slot in tracers if slot.tracer is not tracer]
+
+
+def trace_call(kind: str, name: str, func: Callable[..., Any],
+               *args: Any, **kwargs: Any) -> Any:
+    active: Optional[List[Tracer]] = getattr(trace_state, "active", None)
+    if active is not None:
+        return emit_call(active, kind, name, func, args, kwargs)
+    active = [slot.tracer for slot in tracers if slot.sampled()]
+    trace_state.active = active
+    try:
+        return emit_call(active, kind, name, func, args, kwargs)
+    finally:
+        trace_state.active = None
+
+
+def emit_call(active: List[Tracer], kind: str, name: str,
+              func: Callable[..., Any], args: Tuple[Any, ...],
+              kwargs: Dict[str, Any]) -> Any:
+    if not active:
+        return func(*args, **kwargs)
+    started: List[Tracer] = []
+    for tracer in active:
+        try:
+            tracer.on_start(kind, name)
+            started += [tracer]
+        except Exception:
+            pass
+    start: float = time.perf_counter()
+    try:
+        result: Any = func(*args, **kwargs)
+    except BaseException as e:
+        elapsed: float = time.perf_counter() - start
+        for tracer in reversed(started):
+            try:
+                tracer.on_error(kind, name, elapsed, e)
+            except Exception:
+                pass
+        raise
+    elapsed = time.perf_counter() - start
+    for tracer in reversed(started):
+        try:
+            tracer.on_end(kind, name, elapsed)
+        except Exception:
+            pass
+    return result
+
+
+def traced(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not tracers:
+                return method(self, *args, **kwargs)
+            name: str = f"{type(self).__name__}.{method.__name__}"
+            return trace_call(kind, name, method, self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def load_env_tracer() -> Any:
+    if not os.environ.get("NEXUS_TRACE"):
+        return None
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import nexus_trace
+    return nexus_trace.install_env_tracer(register_tracer)
 
 
 class DataStream(ABC):
@@ -9,6 +122,12 @@ class DataStream(ABC):
         self.stream_type: str = stream_type
         self.total_items: int = 0
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "process_batch" in cls.__dict__:
+            cls.process_batch = traced("stream")(
+                cls.__dict__["process_batch"])
+
     @abstractmethod
     def process_batch(self, data_batch: List[Any]) -> str:
         pass
@@ -85,59 +204,228 @@ class SensorStream(DataStream):
             return []
 
 
+AMOUNT_SCALE: int = 2
+AMOUNT_UNIT: int = 10 ** AMOUNT_SCALE
+LARGE_TRANSACTION: int = 1000000 * AMOUNT_UNIT
+INT64_MIN: int = -2 ** 63
+INT64_MAX: int = 2 ** 63 - 1
+
+
+def parse_amount(text: str) -> int:
+    digits: str = text.strip()
+    sign: int = 1
+    if digits[:1] in ("+", "-"):
+        sign = -1 if digits[0] == "-" else 1
+        digits = digits[1:]
+    whole: str = digits
+    frac: str = ""
+    if "." in digits:
+        whole, frac = digits.split(".", 1)
+    if whole == "" and frac == "":
+        raise ValueError(f"Invalid amount: {text!r}")
+    for part in (whole, frac):
+        if part != "" and not (part.isascii() and part.isdigit()):
+            raise ValueError(f"Invalid amount: {text!r}")
+    if len(frac) > AMOUNT_SCALE:
+        raise ValueError(f"Amount {text!r} exceeds {AMOUNT_SCALE} decimals")
+    frac += "0" * (AMOUNT_SCALE - len(frac))
+    return sign * (int(whole or "0") * AMOUNT_UNIT + int(frac or "0"))
+
+
+def format_amount(amount: int) -> str:
+    sign: str = "-" if amount < 0 else "+"
+    whole, frac = divmod(abs(amount), AMOUNT_UNIT)
+    if frac == 0:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{frac:0{AMOUNT_SCALE}d}"
+
+
+class LedgerShard:
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.net_flow: array = array("q")
+
+    def plan(self, postings: List[Tuple[str, int]]) -> Dict[str, int]:
+        pending: Dict[str, int] = {}
+        for account, amount in postings:
+            current: Optional[int] = pending.get(account)
+            if current is None:
+                slot: Optional[int] = self.index.get(account)
+                current = 0 if slot is None else self.net_flow[slot]
+            current += amount
+            if not INT64_MIN <= current <= INT64_MAX:
+                raise OverflowError(
+                    f"Net flow of {account!r} exceeds the int64 range")
+            pending[account] = current
+        return pending
+
+    def apply(self, pending: Dict[str, int]) -> None:
+        for account, value in pending.items():
+            slot: Optional[int] = self.index.get(account)
+            if slot is None:
+                self.index[account] = len(self.net_flow)
+                self.net_flow.append(value)
+            else:
+                self.net_flow[slot] = value
+
+
+class FixedPointLedger:
+    def __init__(self, shards: int = 16) -> None:
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        self.shards: List[LedgerShard] = [LedgerShard()
+                                          for _ in range(shards)]
+
+    def shard_for(self, account: str) -> LedgerShard:
+        return self.shards[hash(account) % len(self.shards)]
+
+    def post(self, account: str, amount: int) -> None:
+        shard: LedgerShard = self.shard_for(account)
+        with shard.lock:
+            shard.apply(shard.plan([(account, amount)]))
+
+    def post_many(self, postings: List[Tuple[str, int]]) -> None:
+        buckets: Dict[int, List[Tuple[str, int]]] = {}
+        for account, amount in postings:
+            buckets.setdefault(hash(account) % len(self.shards),
+                               []).append((account, amount))
+        order: List[int] = sorted(buckets)
+        locked: List[LedgerShard] = []
+        try:
+            for i in order:
+                self.shards[i].lock.acquire()
+                locked += [self.shards[i]]
+            plans: List[Dict[str, int]] = [
+                self.shards[i].plan(buckets[i]) for i in order]
+            for i, pending in zip(order, plans):
+                self.shards[i].apply(pending)
+        finally:
+            for shard in reversed(locked):
+                shard.lock.release()
+
+    def net_flow(self, account: str) -> int:
+        shard: LedgerShard = self.shard_for(account)
+        with shard.lock:
+            slot: Optional[int] = shard.index.get(account)
+            return 0 if slot is None else shard.net_flow[slot]
+
+    def lock_all(self) -> None:
+        for shard in self.shards:
+            shard.lock.acquire()
+
+    def unlock_all(self) -> None:
+        for shard in reversed(self.shards):
+            shard.lock.release()
+
+    def total(self) -> int:
+        total: int = 0
+        self.lock_all()
+        try:
+            for shard in self.shards:
+                total += sum(shard.net_flow)
+        finally:
+            self.unlock_all()
+        return total
+
+    def balances(self) -> Dict[str, int]:
+        result: Dict[str, int] = {}
+        self.lock_all()
+        try:
+            for shard in self.shards:
+                for account, slot in shard.index.items():
+                    result[account] = shard.net_flow[slot]
+        finally:
+            self.unlock_all()
+        return result
+
+
 class TransactionStream(DataStream):
-    def __init__(self, stream_id: str) -> None:
+    def __init__(self, stream_id: str,
+                 ledger: Optional[FixedPointLedger] = None) -> None:
         super().__init__(stream_id, "Financial Data")
         self.large_transactions: int = 0
+        self.rejected_transactions: int = 0
+        self.lock: threading.Lock = threading.Lock()
+        self.ledger: FixedPointLedger = (ledger if ledger is not None
+                                         else FixedPointLedger())
 
     def process_batch(self, data_batch: List[Any]) -> str:
         try:
-            filtered: List[Any] = self.filter_data(data_batch)
-            if filtered == []:
+            parsed: List[Tuple[str, str, str, int]] = self.parse_batch(
+                data_batch)
+            if parsed == []:
                 raise Exception("No valid transaction data")
             total: int = 0
-            for line in filtered:
-                words: List[str] = line.split(":")
-                key: str = words[0]
-                value: int = int(words[1])
-                if key == "buy" and value < 1000000:
-                    self.total_items += 1
-                    total += value
-                elif key == "sell" and value < 1000000:
-                    self.total_items += 1
-                    total -= value
-                else:
-                    self.large_transactions += 1
-            return f"{self.total_items} operations, net flow: {total:+} units"
+            large: int = 0
+            postings: List[Tuple[str, int]] = []
+            for _, account, key, amount in parsed:
+                if amount >= LARGE_TRANSACTION:
+                    large += 1
+                    continue
+                flow: int = amount if key == "buy" else -amount
+                total += flow
+                postings += [(account, flow)]
+            try:
+                self.ledger.post_many(postings)
+            except OverflowError as e:
+                with self.lock:
+                    self.large_transactions += large
+                    self.rejected_transactions += len(postings)
+                raise Exception(f"Batch rejected: {e}")
+            with self.lock:
+                self.large_transactions += large
+                self.total_items += len(postings)
+                total_items: int = self.total_items
+            return (f"{total_items} operations, "
+                    f"net flow: {format_amount(total)} units")
         except Exception as e:
             print(e)
             return f"{e}"
 
     def filter_data(self, data_batch: List[Any],
                     criteria: Optional[str] = None) -> List[Any]:
-        try:
-            filtered: List[Any] = super().filter_data(data_batch)
-            valid_data: List[Any] = []
-            for line in filtered:
-                if not isinstance(line, str):
-                    raise TypeError
-                words: List[str] = line.split(":")
-                i: int = 0
-                for _ in words:
-                    i += 1
-                if i != 2:
-                    raise ValueError
+        return [line for line, _, _, _ in self.parse_batch(data_batch)]
+
+    def parse_batch(self,
+                    data_batch: List[Any]) -> List[Tuple[str, str, str, int]]:
+        filtered: List[Any] = super().filter_data(data_batch)
+        valid_data: List[Tuple[str, str, str, int]] = []
+        flagged: int = 0
+        rejected: int = 0
+        for line in filtered:
+            words: List[str] = line.split(":")
+            i: int = 0
+            for _ in words:
+                i += 1
+            if i == 2:
+                account: str = self.stream_id
                 key: str = words[0]
-                value: Union[int, float] = float(words[1])
-                if key == "buy" and value > 0:
-                    valid_data += [line]
-                elif key == "sell" and value > 0:
-                    valid_data += [line]
-                else:
-                    self.large_transactions += 1
-            return valid_data
-        except Exception:
-            return []
+            elif i == 3:
+                account = words[0]
+                key = words[1]
+            else:
+                rejected += 1
+                continue
+            try:
+                value: int = parse_amount(words[i - 1])
+            except ValueError:
+                rejected += 1
+                continue
+            if (key == "buy" or key == "sell") and value > 0:
+                valid_data += [(line, account, key, value)]
+            else:
+                flagged += 1
+        with self.lock:
+            self.large_transactions += flagged
+            self.rejected_transactions += rejected
+        return valid_data
+
+    def get_stats(self) -> Dict[str, Union[str, int, float]]:
+        stats: Dict[str, Union[str, int, float]] = super().get_stats()
+        stats["rejected_transactions"] = self.rejected_transactions
+        stats["net_flow"] = format_amount(self.ledger.total())
+        return stats
 
 
 class EventStream(DataStream):
@@ -221,32 +509,37 @@ class StreamProcessor:
 
 
 def main() -> None:
-    print("=== CODE NEXUS - POLYMORPHIC STREAM SYSTEM ===")
-    print()
-    processor: StreamProcessor = StreamProcessor()
-    processor.add_stream(SensorStream("SENSOR_001"))
-    processor.add_stream(TransactionStream("TRANS_001"))
-    processor.add_stream(EventStream("EVENT_001"))
-    batches: list[List[Any]] = [
-        ["temp:22.5", "humidity:65", "pressure:1013"],
-        ["buy:100", "sell:150", "buy:75"],
-        ["login", "error", "logout"]
-    ]
-    processor.process_all(batches)
-    print("=== Polymorphic Stream Processing ===")
-    print()
-    processor2: StreamProcessor = StreamProcessor()
-    processor2.add_stream(SensorStream("SENSOR_001"))
-    processor2.add_stream(TransactionStream("TRANS_001"))
-    processor2.add_stream(EventStream("EVENT_001"))
-    batches: list[List[Any]] = [
-        ["temp:22.5", "humidity:65", "temp:500", "pressure:5000"],
-        ["buy:100", "sell:150", "buy:75", "sell:100", "sell:1000000"],
-        ["login", "error", "logout"]
-    ]
-    processor2.process_status(batches)
-    print()
-    print("All streams processed successfully. Nexus throughput optimal.")
+    collector: Any = load_env_tracer()
+    try:
+        print("=== CODE NEXUS - POLYMORPHIC STREAM SYSTEM ===")
+        print()
+        processor: StreamProcessor = StreamProcessor()
+        processor.add_stream(SensorStream("SENSOR_001"))
+        processor.add_stream(TransactionStream("TRANS_001"))
+        processor.add_stream(EventStream("EVENT_001"))
+        batches: list[List[Any]] = [
+            ["temp:22.5", "humidity:65", "pressure:1013"],
+            ["buy:100", "sell:150", "buy:75"],
+            ["login", "error", "logout"]
+        ]
+        processor.process_all(batches)
+        print("=== Polymorphic Stream Processing ===")
+        print()
+        processor2: StreamProcessor = StreamProcessor()
+        processor2.add_stream(SensorStream("SENSOR_001"))
+        processor2.add_stream(TransactionStream("TRANS_001"))
+        processor2.add_stream(EventStream("EVENT_001"))
+        batches: list[List[Any]] = [
+            ["temp:22.5", "humidity:65", "temp:500", "pressure:5000"],
+            ["buy:100", "sell:150", "buy:75", "sell:100", "sell:1000000"],
+            ["login", "error", "logout"]
+        ]
+        processor2.process_status(batches)
+        print()
+        print("All streams processed successfully. Nexus throughput optimal.")
+    finally:
+        if collector is not None:
+            collector.flush()
 
 
 if __name__ == "__main__":
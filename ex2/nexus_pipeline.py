@@ -1,6 +1,121 @@
-from typing import Any, List, Dict, Union, Protocol
+from typing import (Any, List, Dict, Union, Optional, Tuple, Callable,
+                    Iterator, Protocol)
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import deque, OrderedDict
+import copy
+import functools
+import hashlib
+import itertools
+import os
+import struct
+import sys
+import threading
+import time
+
+
+class Tracer(Protocol):
+    def on_start(self, kind: str, name: str) -> None:
+        ...
+
+    def on_end(self, kind: str, name: str, elapsed: float) -> None:
+        ...
+
+    def on_error(self, kind: str, name: str, elapsed: float,
+                 error: BaseException) -> None:
+        ...
+
+
+class TracerSlot:
+    def __init__(self, tracer: Tracer, sample_every: int) -> None:
+        self.tracer: Tracer = tracer
+        self.sample_every: int = sample_every
+        self.counter: Iterator[int] = itertools.count()
+
+    def sampled(self) -> bool:
+        return next(self.counter) % self.sample_every == 0
+
+
+tracers: List[TracerSlot] = []
+trace_state: threading.local = threading.local()
+
+
+def register_tracer(tracer: Tracer, sample_every: int = 1) -> None:
+    global tracers
+    if sample_every <= 0:
+        raise ValueError("sample_every must be positive")
+    tracers = tracers + [TracerSlot(tracer, sample_every)]
+
+
+def unregister_tracer(tracer: Tracer) -> None:
+    global tracers
+    tracers = [slot for slot in tracers if slot.tracer is not tracer]
+
+
+def trace_call(kind: str, name: str, func: Callable[..., Any],
+               *args: Any, **kwargs: Any) -> Any:
+    active: Optional[List[Tracer]] = getattr(trace_state, "active", None)
+    if active is not None:
+        return emit_call(active, kind, name, func, args, kwargs)
+    active = [slot.tracer for slot in tracers if slot.sampled()]
+    trace_state.active = active
+    try:
+        return emit_call(active, kind, name, func, args, kwargs)
+    finally:
+        trace_state.active = None
+
+
+def emit_call(active: List[Tracer], kind: str, name: str,
+              func: Callable[..., Any], args: Tuple[Any, ...],
+              kwargs: Dict[str, Any]) -> Any:
+    if not active:
+        return func(*args, **kwargs)
+    started: List[Tracer] = []
+    for tracer in active:
+        try:
+            tracer.on_start(kind, name)
+            started += [tracer]
+        except Exception:
+            pass
+    start: float = time.perf_counter()
+    try:
+        result: Any = func(*args, **kwargs)
+    except BaseException as e:
+        elapsed: float = time.perf_counter() - start
+        for tracer in reversed(started):
+            try:
+                tracer.on_error(kind, name, elapsed, e)
+            except Exception:
+                pass
+        raise
+    elapsed = time.perf_counter() - start
+    for tracer in reversed(started):
+        try:
+            tracer.on_end(kind, name, elapsed)
+        except Exception:
+            pass
+    return result
+
+
+def traced(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not tracers:
+                return method(self, *args, **kwargs)
+            name: str = f"{type(self).__name__}.{method.__name__}"
+            return trace_call(kind, name, method, self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def load_env_tracer() -> Any:
+    if not os.environ.get("NEXUS_TRACE"):
+        return None
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import nexus_trace
+    return nexus_trace.install_env_tracer(register_tracer)
 
 
 class ProcessingStage(Protocol):
@@ -35,12 +150,159 @@ class OutputStage():
         return data
 
 
+class ChecksumStage():
+    pure: bool = True
+
+    def __init__(self, rounds: int = 20000) -> None:
+        self.rounds: int = rounds
+
+    def process(self, data: Any) -> Any:
+        digest: bytes = stable_hash(data)
+        for _ in range(self.rounds):
+            digest = hashlib.sha256(digest).digest()
+        return digest.hex()
+
+
+def _encode(data: Any, out: List[bytes]) -> None:
+    if data is None:
+        out += [b"N"]
+    elif isinstance(data, bool):
+        out += [b"T" if data else b"F"]
+    elif isinstance(data, int):
+        raw: bytes = str(data).encode()
+        out += [b"i", struct.pack("<I", len(raw)), raw]
+    elif isinstance(data, float):
+        out += [b"f", struct.pack("<d", data)]
+    elif isinstance(data, str):
+        raw = data.encode("utf-8", "surrogatepass")
+        out += [b"s", struct.pack("<I", len(raw)), raw]
+    elif isinstance(data, bytes):
+        out += [b"b", struct.pack("<I", len(data)), data]
+    elif isinstance(data, (list, tuple)):
+        out += [b"l" if isinstance(data, list) else b"t",
+                struct.pack("<I", len(data))]
+        for item in data:
+            _encode(item, out)
+    elif isinstance(data, dict):
+        items: List[Tuple[bytes, Any]] = []
+        for k, v in data.items():
+            key: List[bytes] = []
+            _encode(k, key)
+            items += [(b"".join(key), v)]
+        items.sort(key=lambda item: item[0])
+        out += [b"d", struct.pack("<I", len(items))]
+        for k, v in items:
+            out += [k]
+            _encode(v, out)
+    else:
+        raise TypeError(f"Cannot hash {type(data).__name__} input")
+
+
+def stable_hash(data: Any) -> bytes:
+    out: List[bytes] = []
+    _encode(data, out)
+    return hashlib.blake2b(b"".join(out), digest_size=16).digest()
+
+
+def _size_of(data: Any) -> int:
+    size: int = sys.getsizeof(data)
+    if isinstance(data, dict):
+        for k, v in data.items():
+            size += _size_of(k) + _size_of(v)
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            size += _size_of(item)
+    return size
+
+
+class StageCache:
+    def __init__(self, max_entries: Optional[int] = 128,
+                 max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.max_entries: Optional[int] = max_entries
+        self.max_bytes: Optional[int] = max_bytes
+        self.ttl: Optional[float] = ttl
+        self.clock: Callable[[], float] = clock
+        self.entries: OrderedDict[
+            Tuple[object, bytes], Tuple[Any, int, float]] = OrderedDict()
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def get(self, key: Tuple[object, bytes]) -> Tuple[bool, Any]:
+        entry: Optional[Tuple[Any, int, float]] = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        value, size, expires = entry
+        if self.ttl is not None and self.clock() >= expires:
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def put(self, key: Tuple[object, bytes], value: Any) -> None:
+        size: int = _size_of(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._drop(key)
+        expires: float = 0.0
+        if self.ttl is not None:
+            expires = self.clock() + self.ttl
+        self.entries[key] = (value, size, expires)
+        self.current_bytes += size
+        while ((self.max_entries is not None
+                and len(self.entries) > self.max_entries)
+               or (self.max_bytes is not None
+                   and self.current_bytes > self.max_bytes)):
+            oldest: Tuple[object, bytes] = next(iter(self.entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def _drop(self, key: Tuple[object, bytes]) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.current_bytes -= size
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        lookups: int = self.hits + self.misses
+        stats: Dict[str, Union[int, float]] = {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self.current_bytes
+        return stats
+
+
 class ProcessingPipeline(ABC):
-    def __init__(self, pipeline_id: str) -> None:
+    def __init__(self, pipeline_id: str,
+                 cache: Optional[StageCache] = None) -> None:
         super().__init__()
         self.pipeline_id: str = pipeline_id
         self.stage: List[ProcessingStage] = []
         self.backup: deque[List[ProcessingStage]] = deque()
+        self.cache: Optional[StageCache] = cache
 
     def add_stage(self, Stage: ProcessingStage) -> None:
         self.stage += [Stage]
@@ -49,12 +311,42 @@ class ProcessingPipeline(ABC):
     def process(self, data: Any) -> Any:
         pass
 
+    @traced("pipeline")
     def _run_stage(self, data: Any) -> Any:
         current: Any = data
         for Stage in self.stage:
-            current = Stage.process(current)
+            if tracers:
+                current = trace_call("stage",
+                                     f"{type(Stage).__name__}.process",
+                                     self._apply, Stage, current)
+            else:
+                current = self._apply(Stage, current)
         return current
 
+    def _apply(self, Stage: ProcessingStage, data: Any) -> Any:
+        if self.cache is not None and getattr(Stage, "pure", False):
+            return self._run_cached(self.cache, Stage, data)
+        return Stage.process(data)
+
+    # A stage sets "pure = True" only when its output depends solely on
+    # its own configuration and the input, and when recomputing it costs
+    # more than hashing the input. Results are deep-copied in and out of
+    # the cache so callers may mutate them freely.
+    def _run_cached(self, cache: StageCache,
+                    Stage: ProcessingStage, data: Any) -> Any:
+        try:
+            key: Tuple[object, bytes] = (Stage, stable_hash(data))
+            found: bool
+            result: Any
+            found, result = cache.get(key)
+        except TypeError:
+            return Stage.process(data)
+        if found:
+            return copy.deepcopy(result)
+        result = Stage.process(data)
+        cache.put(key, copy.deepcopy(result))
+        return result
+
     def _snapshot(self) -> None:
         self.backup.append([s for s in self.stage])
 
@@ -67,8 +359,9 @@ class ProcessingPipeline(ABC):
 
 
 class JSONAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__(pipeline_id)
+    def __init__(self, pipeline_id: str,
+                 cache: Optional[StageCache] = None) -> None:
+        super().__init__(pipeline_id, cache)
 
     def process(self, data: Any) -> Union[str, Any]:
         self._snapshot()
@@ -97,8 +390,9 @@ class JSONAdapter(ProcessingPipeline):
 
 
 class CSVAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__(pipeline_id)
+    def __init__(self, pipeline_id: str,
+                 cache: Optional[StageCache] = None) -> None:
+        super().__init__(pipeline_id, cache)
 
     def process(self, data: Any) -> Union[str, Any]:
         self._snapshot()
@@ -126,8 +420,9 @@ class CSVAdapter(ProcessingPipeline):
 
 
 class StreamAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__(pipeline_id)
+    def __init__(self, pipeline_id: str,
+                 cache: Optional[StageCache] = None) -> None:
+        super().__init__(pipeline_id, cache)
 
     def process(self, data: Any) -> Union[str, Any]:
         self._snapshot()
@@ -214,51 +509,103 @@ class NexusManager:
         print(result)
 
 
+def stage_cache_check() -> None:
+    pipe: CSVAdapter = CSVAdapter("cache1", StageCache(max_entries=8))
+    pipe.add_stage(ChecksumStage())
+    first: str = pipe._run_stage("user,action,timestamp")
+    pipe._run_stage({"sensor": "temp", "value": 23.5})
+    assert pipe._run_stage("user,action,timestamp") == first
+    assert pipe._run_stage({"value": 23.5, "sensor": "temp"}) != first
+    stats: Dict[str, Union[int, float]] = pipe.cache.get_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2, stats
+    assert "bytes" not in stats
+
+    lru: StageCache = StageCache(max_entries=2)
+    lru.put(("s", b"a"), "A")
+    lru.put(("s", b"b"), "B")
+    lru.get(("s", b"a"))
+    lru.put(("s", b"c"), "C")
+    assert list(lru.entries) == [("s", b"a"), ("s", b"c")]
+    assert lru.evictions == 1
+
+    size: int = _size_of("x" * 100)
+    sized: StageCache = StageCache(max_entries=None, max_bytes=size * 2)
+    sized.put(("s", b"a"), "a" * 100)
+    sized.put(("s", b"b"), "b" * 100)
+    sized.get(("s", b"a"))
+    sized.put(("s", b"c"), "c" * 100)
+    assert list(sized.entries) == [("s", b"a"), ("s", b"c")]
+    assert sized.get_stats()["bytes"] == size * 2
+
+    now: List[float] = [0.0]
+    timed: StageCache = StageCache(ttl=5.0, clock=lambda: now[0])
+    timed.put(("s", b"a"), "A")
+    now[0] = 4.9
+    assert timed.get(("s", b"a")) == (True, "A")
+    now[0] = 5.0
+    assert timed.get(("s", b"a")) == (False, None)
+    assert timed.expirations == 1 and not timed.entries
+
+    assert (stable_hash({"a": 1, "b": [1, 2.0]})
+            == stable_hash({"b": [1, 2.0], "a": 1}))
+    assert stable_hash({"a": 1}) != stable_hash({"a": 1.0})
+    assert stable_hash([1, 2]) != stable_hash((1, 2))
+    print("Stage cache: hits, LRU eviction, byte bound and TTL verified")
+
+
 def main() -> None:
-    print("=== CODE NEXUS - ENTERPRISE PIPELINE SYSTEM ===")
-    print()
-    print("Initializing Nexus Manager...")
-    manager: NexusManager = NexusManager(1000)
-    print(f"Pipeline capacity: {manager.capacity} streams/second")
-    print()
-    json_pipe: JSONAdapter = JSONAdapter("json1")
-    csv_pipe: CSVAdapter = CSVAdapter("csv1")
-    stream_pipe: StreamAdapter = StreamAdapter("stream1")
-    print("Stage 1: Input validation and parsing")
-    print("Stage 2: Data transformation and enrichment")
-    print("Stage 3: Output formatting and delivery")
-    stages: List[ProcessingStage] = [
-        InputStage(),
-        TransformStage(),
-        OutputStage(),
-    ]
-    for stage in stages:
-        json_pipe.add_stage(stage)
-        csv_pipe.add_stage(stage)
-        stream_pipe.add_stage(stage)
-    print()
-    print("=== Multi-Format Data Processing ===")
-    print()
-    manager.add_pipeline(json_pipe)
-    manager.add_pipeline(csv_pipe)
-    manager.add_pipeline(stream_pipe)
-    data_base: List[Any] = [
-        {"sensor": "temp", "value": 23.5, "unit": "C"},
-        "user,action,timestamp",
-        "Real-time sensor stream",
-    ]
-    manager.run_demo(data_base)
-    print("=== Pipeline Chaining Demo ===")
-    print("Pipeline A -> Pipeline B -> Pipeline C")
-    print("Data flow: Raw -> Processed -> Analyzed -> Stored")
-    print()
-    manager.chain_demo(100)
-    print()
-    print("=== Error Recovery Test ===")
-    print("Simulating pipeline failure...")
-    manager.error_recovery_demo(json_pipe, "bad input")
-    print()
-    print("Nexus Integration complete. All systems operational.")
+    collector: Any = load_env_tracer()
+    try:
+        print("=== CODE NEXUS - ENTERPRISE PIPELINE SYSTEM ===")
+        print()
+        print("Initializing Nexus Manager...")
+        manager: NexusManager = NexusManager(1000)
+        print(f"Pipeline capacity: {manager.capacity} streams/second")
+        print()
+        json_pipe: JSONAdapter = JSONAdapter("json1")
+        csv_pipe: CSVAdapter = CSVAdapter("csv1")
+        stream_pipe: StreamAdapter = StreamAdapter("stream1")
+        print("Stage 1: Input validation and parsing")
+        print("Stage 2: Data transformation and enrichment")
+        print("Stage 3: Output formatting and delivery")
+        stages: List[ProcessingStage] = [
+            InputStage(),
+            TransformStage(),
+            OutputStage(),
+        ]
+        for stage in stages:
+            json_pipe.add_stage(stage)
+            csv_pipe.add_stage(stage)
+            stream_pipe.add_stage(stage)
+        print()
+        print("=== Multi-Format Data Processing ===")
+        print()
+        manager.add_pipeline(json_pipe)
+        manager.add_pipeline(csv_pipe)
+        manager.add_pipeline(stream_pipe)
+        data_base: List[Any] = [
+            {"sensor": "temp", "value": 23.5, "unit": "C"},
+            "user,action,timestamp",
+            "Real-time sensor stream",
+        ]
+        manager.run_demo(data_base)
+        print("=== Pipeline Chaining Demo ===")
+        print("Pipeline A -> Pipeline B -> Pipeline C")
+        print("Data flow: Raw -> Processed -> Analyzed -> Stored")
+        print()
+        manager.chain_demo(100)
+        print()
+        print("=== Error Recovery Test ===")
+        print("Simulating pipeline failure...")
+        manager.error_recovery_demo(json_pipe, "bad input")
+        print()
+        print("=== Stage Cache Test ===")
+        stage_cache_check()
+        print()
+        print("Nexus Integration complete. All systems operational.")
+    finally:
+        if collector is not None:
+            collector.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+from typing import Any, List, Dict, Optional, Callable
+import os
+import threading
+import time
+
+
+class FoldedStackCollector:
+    def __init__(self, path: str, spans_path: Optional[str] = None,
+                 max_buffered: int = 10000) -> None:
+        self.path: str = path
+        self.spans_path: str = (spans_path if spans_path is not None
+                                else path + ".spans")
+        self.max_buffered: int = max_buffered
+        self.folded: Dict[str, int] = {}
+        self.spans: List[str] = []
+        self.spans_started: bool = False
+        self.origin: float = time.perf_counter()
+        self.lock: threading.Lock = threading.Lock()
+        self.local: threading.local = threading.local()
+
+    def stack(self) -> List[List[Any]]:
+        frames: Optional[List[List[Any]]] = getattr(self.local, "stack", None)
+        if frames is None:
+            frames = []
+            self.local.stack = frames
+        return frames
+
+    def on_start(self, kind: str, name: str) -> None:
+        self.stack().append([name, time.perf_counter(), 0.0])
+
+    def on_end(self, kind: str, name: str, elapsed: float) -> None:
+        self.record(kind, elapsed, "ok")
+
+    def on_error(self, kind: str, name: str, elapsed: float,
+                 error: BaseException) -> None:
+        self.record(kind, elapsed, type(error).__name__)
+
+    def record(self, kind: str, elapsed: float, status: str) -> None:
+        frames: List[List[Any]] = self.stack()
+        folded: str = ";".join(frame[0] for frame in frames)
+        _, start, child = frames.pop()
+        if frames:
+            frames[-1][2] += elapsed
+        self_us: int = max(round((elapsed - child) * 1e6), 0)
+        span: str = (f"{threading.get_ident()}\t{kind}\t{folded}\t"
+                     f"{(start - self.origin) * 1e6:.1f}\t"
+                     f"{elapsed * 1e6:.1f}\t{status}")
+        with self.lock:
+            self.folded[folded] = self.folded.get(folded, 0) + self_us
+            self.spans += [span]
+            if len(self.spans) >= self.max_buffered:
+                self.write_spans()
+
+    def write_spans(self) -> None:
+        mode: str = "a" if self.spans_started else "w"
+        self.spans_started = True
+        with open(self.spans_path, mode, encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(span + "\n")
+        self.spans = []
+
+    def flush(self) -> None:
+        with self.lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                for folded, self_us in self.folded.items():
+                    f.write(f"{folded} {self_us}\n")
+            self.write_spans()
+
+
+def install_env_tracer(
+        register: Callable[[Any, int], None]
+        ) -> Optional[FoldedStackCollector]:
+    path: Optional[str] = os.environ.get("NEXUS_TRACE")
+    if not path:
+        return None
+    sample: str = os.environ.get("NEXUS_TRACE_SAMPLE", "1")
+    sample_every: int
+    try:
+        sample_every = int(sample)
+        if sample_every <= 0:
+            raise ValueError
+    except ValueError:
+        print(f"Invalid NEXUS_TRACE_SAMPLE {sample!r}: tracing every call")
+        sample_every = 1
+    collector: FoldedStackCollector = FoldedStackCollector(path)
+    register(collector, sample_every)
+    return collector